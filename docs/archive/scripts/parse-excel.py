@@ -5,9 +5,24 @@ Parses all 9 sheets and extracts hierarchy + attributes
 """
 
 import pandas as pd
+import hashlib
 import json
+import os
+import pickle
+import re
 import sys
-from typing import Dict, List, Set
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.io.parsers.readers import STR_NA_VALUES
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import orjson  # Optional: much faster JSON serializer
+except ImportError:
+    orjson = None
 
 # Sheet names in Excel
 SHEETS = [
@@ -22,6 +37,16 @@ SHEETS = [
     'DENIM'
 ]
 
+# Parsed results are cached here, keyed by workbook + parser content hash
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.parse-excel-cache')
+
+# Cell strings pd.read_excel reads as NaN: pandas' default NA strings
+# ('', 'NA', 'N/A', 'null', ...) plus Excel error values ('#DIV/0!', ...)
+NA_VALUES = frozenset(STR_NA_VALUES) | frozenset(ERROR_CODES)
+
+# Header row in every sheet (1-based); data starts on the row after it
+HEADER_ROW = 5
+
 # Columns to exclude (hierarchy/metadata, not attributes)
 HIERARCHY_COLS = [
     'GMT FAB DIV',
@@ -46,121 +71,321 @@ HIERARCHY_COLS = [
     'FABRIC DIVISION FULL NAME',
     'FABRIC_SHEET'
 ]
+HIERARCHY_SET = frozenset(HIERARCHY_COLS)
 
-def normalize_key(name: str) -> str:
-    """Convert column name to database key"""
-    if not name or pd.isna(name):
-        return None
-    return str(name).strip().replace('-', '_').replace(' ', '_').replace('/', '_').upper()
+# Low-cardinality hierarchy codes stored as pandas categoricals, so
+# drop_duplicates/groupby hash integer codes instead of strings
+CATEGORICAL_COLS = [
+    'FINISHED GOODS DIVISION',
+    'SUB-DIVISION',
+    'MAJOR CATEGORY',
+    'FABRIC_SHEET'
+]
+
+# Keyword sets used to classify attributes by their normalized key
+FABRIC_KEYWORDS = ['YARN', 'WEAVE', 'COMPOSITION', 'FINISH', 'CONSTRUCTION', 'GRAM', 'COUNT', 'LYCRA', 'FABRIC']
+DESIGN_KEYWORDS = ['NECK', 'COLLAR', 'SLEEVES', 'CUFF', 'FIT', 'PATTERN', 'STYLE', 'SHAPE', 'LENGTH', 'PRINT', 'EMBROIDERY', 'WASH', 'POCKET', 'WAIST', 'RISE', 'LEG', 'PLACKET']
+TECHNICAL_KEYWORDS = ['GSM', 'OUNCE', 'COUNT', 'SHADE', 'SIZE']
+
+VISIBLE_KEYWORDS = [
+    'NECK', 'COLLAR', 'SLEEVES', 'FIT', 'PATTERN', 'COLOR',
+    'STYLE', 'SHAPE', 'LENGTH', 'PRINT', 'EMBROIDERY', 'WASH',
+    'PLACKET', 'POCKET', 'WAIST', 'RISE', 'LEG', 'CLOSURE'
+]
+
+# Fabric technical details are NOT visible in product photos
+NON_EXTRACTABLE = frozenset([
+    'YARN_01', 'YARN_02', 'WEAVE', 'WEAVE_2', 'COMPOSITION', 
+    'FINISH', 'CONSTRUCTION', 'GRAM_PER_SQUARE_METER', 'OUNCE',
+    'COUNT', 'SHADE', 'FABRIC_MAIN_MVGR'
+])
+
+# First matching keyword (in this order) wins
+PRIORITIES = {
+    'NECK': 95,
+    'COLLAR': 90,
+    'SLEEVES': 90,
+    'FIT': 85,
+    'PATTERN': 85,
+    'COLOR': 90,
+    'STYLE': 80,
+    'LENGTH': 75,
+    'PRINT': 70,
+    'EMBROIDERY': 65,
+    'PLACKET': 70,
+    'POCKET': 65,
+    'WAIST': 75,
+    'CLOSURE': 70
+}
+
+def _keyword_regex(keywords: List[str]) -> re.Pattern:
+    """Compile keywords into one substring-alternation regex"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+FABRIC_RE = _keyword_regex(FABRIC_KEYWORDS)
+DESIGN_RE = _keyword_regex(DESIGN_KEYWORDS)
+TECHNICAL_RE = _keyword_regex(TECHNICAL_KEYWORDS)
+VISIBLE_RE = _keyword_regex(VISIBLE_KEYWORDS)
+
+# Anchored lookaheads tried in PRIORITIES order, so lastgroup names the
+# first keyword in that order found anywhere in the key (not the leftmost)
+PRIORITY_RE = re.compile(
+    '^(?:' + '|'.join(f'(?=.*{re.escape(kw)})(?P<{kw}>)' for kw in PRIORITIES) + ')',
+    re.DOTALL
+)
+
+def strip_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Stringify and strip every cell, keeping missing values as None"""
+    stripped = df.astype(str).apply(lambda s: s.str.strip())
+    return stripped.astype(object).where(df.notna(), None)
+
+def unique_rows(frames: List[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+    """Unique rows of columns across all frames, in first-seen order"""
+    parts = [df.reindex(columns=columns).drop_duplicates() for df in frames]
+    return pd.concat(parts, ignore_index=True).drop_duplicates()
+
+def intern_code(value: Optional[str]) -> Optional[str]:
+    """Intern a code string so repeated codes share one object"""
+    return sys.intern(value) if value is not None else None
+
+def normalize_keys(columns: pd.Index) -> Dict:
+    """Convert column names to database keys (one vectorized pass)"""
+    keys = columns.astype(str).str.strip().str.replace(r'[- /]', '_', regex=True).str.upper()
+    return dict(zip(columns, map(sys.intern, keys)))
 
 def categorize_attribute(attr_name: str) -> str:
     """Determine attribute category"""
     attr_upper = attr_name.upper()
     
-    fabric_keywords = ['YARN', 'WEAVE', 'COMPOSITION', 'FINISH', 'CONSTRUCTION', 'GRAM', 'COUNT', 'LYCRA', 'FABRIC']
-    design_keywords = ['NECK', 'COLLAR', 'SLEEVES', 'CUFF', 'FIT', 'PATTERN', 'STYLE', 'SHAPE', 'LENGTH', 'PRINT', 'EMBROIDERY', 'WASH', 'POCKET', 'WAIST', 'RISE', 'LEG', 'PLACKET']
-    technical_keywords = ['GSM', 'OUNCE', 'COUNT', 'SHADE', 'SIZE']
-    
-    if any(kw in attr_upper for kw in fabric_keywords):
+    if FABRIC_RE.search(attr_upper):
         return 'fabric'
-    elif any(kw in attr_upper for kw in design_keywords):
+    elif DESIGN_RE.search(attr_upper):
         return 'design'
-    elif any(kw in attr_upper for kw in technical_keywords):
+    elif TECHNICAL_RE.search(attr_upper):
         return 'technical'
     else:
         return 'other'
 
 def is_ai_extractable(key: str) -> bool:
     """Determine if attribute can be extracted by AI from images"""
-    # Fabric technical details are NOT visible in product photos
-    non_extractable = [
-        'YARN_01', 'YARN_02', 'WEAVE', 'WEAVE_2', 'COMPOSITION', 
-        'FINISH', 'CONSTRUCTION', 'GRAM_PER_SQUARE_METER', 'OUNCE',
-        'COUNT', 'SHADE', 'FABRIC_MAIN_MVGR'
-    ]
-    return key not in non_extractable
+    return key not in NON_EXTRACTABLE
 
 def is_visible(key: str) -> bool:
     """Determine if attribute is visible from product photo"""
-    visible_keywords = [
-        'NECK', 'COLLAR', 'SLEEVES', 'FIT', 'PATTERN', 'COLOR',
-        'STYLE', 'SHAPE', 'LENGTH', 'PRINT', 'EMBROIDERY', 'WASH',
-        'PLACKET', 'POCKET', 'WAIST', 'RISE', 'LEG', 'CLOSURE'
-    ]
-    return any(kw in key for kw in visible_keywords)
+    return VISIBLE_RE.search(key) is not None
 
 def get_priority(key: str) -> int:
     """Get extraction priority (1-100, higher = more important)"""
-    priorities = {
-        'NECK': 95,
-        'COLLAR': 90,
-        'SLEEVES': 90,
-        'FIT': 85,
-        'PATTERN': 85,
-        'COLOR': 90,
-        'STYLE': 80,
-        'LENGTH': 75,
-        'PRINT': 70,
-        'EMBROIDERY': 65,
-        'PLACKET': 70,
-        'POCKET': 65,
-        'WAIST': 75,
-        'CLOSURE': 70
-    }
-    
-    for keyword, priority in priorities.items():
-        if keyword in key:
-            return priority
+    match = PRIORITY_RE.match(key)
+    if match:
+        return PRIORITIES[match.lastgroup]
     
     return 50  # Default
 
-def generate_aliases(short_form: str, full_form: str) -> List[str]:
-    """Generate alternative names for better AI matching"""
+@lru_cache(maxsize=None)
+def classify(key: str) -> Tuple[str, bool, bool, int]:
+    """Classify an attribute key: (category, ai_extractable, visible, priority)"""
+    return categorize_attribute(key), is_ai_extractable(key), is_visible(key), get_priority(key)
+
+def classify_keys(keys: List[str]) -> Dict[str, Tuple[str, bool, bool, int]]:
+    """Build a {key: classification} lookup table for the given keys"""
+    return {key: classify(key) for key in dict.fromkeys(keys)}
+
+@lru_cache(maxsize=None)
+def generate_aliases(short_form: Optional[str], full_form: Optional[str]) -> Tuple[str, ...]:
+    """Generate alternative names for better AI matching (cached per pair)"""
     aliases = set()
     
-    if short_form and not pd.isna(short_form):
-        aliases.add(str(short_form).strip())
+    if short_form:
+        aliases.add(short_form.strip())
         # Add variations
-        aliases.add(str(short_form).replace('_', ' '))
-        aliases.add(str(short_form).replace('-', ' '))
+        aliases.add(short_form.replace('_', ' '))
+        aliases.add(short_form.replace('-', ' '))
     
-    if full_form and not pd.isna(full_form) and str(full_form) != str(short_form):
-        aliases.add(str(full_form).strip())
+    if full_form and full_form != short_form:
+        aliases.add(full_form.strip())
         # Add variations
-        aliases.add(str(full_form).replace('_', ' '))
-        aliases.add(str(full_form).replace('-', ' '))
+        aliases.add(full_form.replace('_', ' '))
+        aliases.add(full_form.replace('-', ' '))
     
-    return list(filter(None, aliases))
+    return tuple(filter(None, aliases))
 
-def parse_excel(file_path: str) -> Dict:
-    """Parse Excel file and extract all data"""
+def _cell_value(value):
+    """Normalize a raw openpyxl cell value the way pd.read_excel would"""
+    if isinstance(value, str) and value in NA_VALUES:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def load_sheet(ws) -> pd.DataFrame:
+    """Stream a read-only worksheet into a DataFrame (header on HEADER_ROW)"""
+    rows = ws.iter_rows(min_row=HEADER_ROW, values_only=True)
+    header = next(rows, ())
+    
+    data = []
+    for row in rows:
+        values = tuple(_cell_value(v) for v in row)
+        # Skip empty rows early
+        if all(v is None for v in values):
+            continue
+        data.append(values)
+    
+    width = max([len(header)] + [len(r) for r in data])
+    columns = []
+    seen = {}
+    for i in range(width):
+        name = header[i] if i < len(header) and header[i] is not None else f'Unnamed: {i}'
+        # Mangle duplicate headers like pandas does (NAME, NAME.1, ...)
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        columns.append(name)
+    
+    data = [r + (None,) * (width - len(r)) for r in data]
+    df = pd.DataFrame(data, columns=columns)
+    
+    # pd.read_excel reads all-empty columns as float64 NaN; match it so
+    # they upcast numeric columns from other sheets the same way
+    empty_cols = df.columns[df.isna().all()]
+    df[empty_cols] = df[empty_cols].astype(float)
+    return df
+
+def open_workbook(file_path: str):
+    """Open the workbook in streamed read-only mode"""
+    return load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+
+def sheet_frame(wb, sheet_name: str) -> pd.DataFrame:
+    """Load one sheet from an open workbook, tagged with its fabric sheet"""
+    df = load_sheet(wb[sheet_name])
+    df['FABRIC_SHEET'] = sheet_name
+    for col in CATEGORICAL_COLS:
+        if col in df:
+            df[col] = df[col].astype('category')
+    return df
+
+def read_sheet(file_path: str, sheet_name: str) -> pd.DataFrame:
+    """Load one sheet in its own workbook handle (runs in a worker process)"""
+    wb = open_workbook(file_path)
+    try:
+        return sheet_frame(wb, sheet_name)
+    finally:
+        wb.close()
+
+def load_sheets(file_path: str) -> Iterator[Tuple[str, Callable[[], pd.DataFrame]]]:
+    """Yield (sheet_name, load) per sheet in SHEETS order; load() returns the frame or raises"""
+    max_workers = min(len(SHEETS), os.cpu_count() or 1)
+    
+    if max_workers == 1:
+        # No parallelism available: open the workbook once and read sheets in turn
+        wb = open_workbook(file_path)
+        try:
+            for sheet_name in SHEETS:
+                yield sheet_name, partial(sheet_frame, wb, sheet_name)
+        finally:
+            wb.close()
+        return
+    
+    # Each worker re-opens the workbook (re-parsing its shared strings),
+    # trading that repeated setup for parsing the sheets concurrently
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(read_sheet, file_path, sheet_name) for sheet_name in SHEETS]
+        for sheet_name, future in zip(SHEETS, futures):
+            yield sheet_name, future.result
+
+def file_hash(path: str) -> str:
+    """Short blake2b digest of a file's contents"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            digest = hashlib.file_digest(f, 'blake2b')
+        else:
+            digest = hashlib.blake2b()
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def parse_excel_cached(file_path: str) -> Dict:
+    """parse_excel(), reusing the result of a previous run on the same workbook"""
+    # Hash this script too, so parser changes invalidate old results
+    cache_key = f"{file_hash(file_path)}-{file_hash(os.path.abspath(__file__))}"
+    cache_path = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
+    
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                data = pickle.load(f)
+            print(f"♻️  Using cached parse: {cache_path}", file=sys.stderr)
+            return data
+        except Exception as e:
+            print(f"   ⚠️  Ignoring unreadable cache ({e})", file=sys.stderr)
+    
+    failed_sheets = []
+    data = parse_excel(file_path, failed_sheets)
+    
+    # Never cache a partial parse, or a one-off failure would stick
+    if failed_sheets:
+        print(f"   ⚠️  Not caching: failed to read {', '.join(failed_sheets)}", file=sys.stderr)
+        return data
+    
+    # Write to a temp file and rename, so an interrupted dump leaves no partial .pkl
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=CACHE_DIR, suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"   ⚠️  Could not write cache ({e})", file=sys.stderr)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    return data
+
+def write_json(data: Dict) -> None:
+    """Write data to stdout as indented JSON"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(data, indent=2))
+
+def parse_excel(file_path: str, failed_sheets: Optional[List[str]] = None) -> Dict:
+    """Parse Excel file and extract all data
+    
+    Sheets that fail to load are reported and skipped; their names are
+    appended to failed_sheets when a list is passed.
+    """
     
     print("📊 Reading Excel file...", file=sys.stderr)
     
     all_data = []
     
-    # Read all sheets
-    for sheet_name in SHEETS:
+    # Read all sheets (in parallel when more than one CPU is available)
+    for sheet_name, load in load_sheets(file_path):
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, header=4)
-            df['FABRIC_SHEET'] = sheet_name
+            df = load()
             all_data.append(df)
             print(f"   ✓ {sheet_name}: {len(df)} rows", file=sys.stderr)
         except Exception as e:
             print(f"   ✗ {sheet_name}: {e}", file=sys.stderr)
+            if failed_sheets is not None:
+                failed_sheets.append(sheet_name)
     
-    # Combine all sheets
-    combined_df = pd.concat(all_data, ignore_index=True)
-    print(f"   Total rows: {len(combined_df)}", file=sys.stderr)
+    # Keep sheets separate; every step below only needs per-sheet reductions
+    all_columns = pd.Index(dict.fromkeys(col for df in all_data for col in df.columns))
+    print(f"   Total rows: {sum(len(df) for df in all_data)}", file=sys.stderr)
     
     # Extract unique departments
     print("\n🏢 Extracting Departments...", file=sys.stderr)
     departments = []
-    dept_df = combined_df[['FINISHED GOODS DIVISION', 'FINISHED GOODS DIVISION FULL NAME']].drop_duplicates().dropna()
+    dept_df = unique_rows(all_data, ['FINISHED GOODS DIVISION', 'FINISHED GOODS DIVISION FULL NAME']).dropna()
     
-    for idx, row in dept_df.iterrows():
-        code = str(row['FINISHED GOODS DIVISION']).strip()
-        full_name = str(row['FINISHED GOODS DIVISION FULL NAME']).strip()
+    for code, full_name in strip_strings(dept_df).itertuples(index=False, name=None):
+        code = intern_code(code)
         departments.append({
             'code': code,
             'name': code,
@@ -171,16 +396,14 @@ def parse_excel(file_path: str) -> Dict:
     # Extract unique sub-divisions
     print("\n📂 Extracting Sub-Divisions...", file=sys.stderr)
     sub_divisions = []
-    subdiv_df = combined_df[[
+    subdiv_df = unique_rows(all_data, [
         'FINISHED GOODS DIVISION',
         'SUB-DIVISION',
         'SUB-DIVISION FULL NAME'
-    ]].drop_duplicates().dropna()
+    ]).dropna()
     
-    for idx, row in subdiv_df.iterrows():
-        dept_code = str(row['FINISHED GOODS DIVISION']).strip()
-        code = str(row['SUB-DIVISION']).strip()
-        full_name = str(row['SUB-DIVISION FULL NAME']).strip()
+    for dept_code, code, full_name in strip_strings(subdiv_df).itertuples(index=False, name=None):
+        dept_code, code = intern_code(dept_code), intern_code(code)
         sub_divisions.append({
             'department_code': dept_code,
             'code': code,
@@ -193,27 +416,25 @@ def parse_excel(file_path: str) -> Dict:
     print("\n📁 Extracting Major Categories...", file=sys.stderr)
     major_categories = []
     seen_codes = set()
-    cat_df = combined_df[[
+    cat_df = unique_rows(all_data, [
         'SUB-DIVISION',
         'MAJOR CATEGORY',
         'MAJOR CATEGORY FULL FORM',
         'MERCHENDISE CATEGORY CODE',
         'MERCHENDISE CATEGORY DESCRIPTION',
         'FABRIC_SHEET'
-    ]].drop_duplicates().dropna(subset=['MAJOR CATEGORY'])
-    
-    for idx, row in cat_df.iterrows():
-        subdiv_code = str(row['SUB-DIVISION']).strip()
-        original_code = str(row['MAJOR CATEGORY']).strip()
-        full_form = str(row['MAJOR CATEGORY FULL FORM']).strip() if not pd.isna(row['MAJOR CATEGORY FULL FORM']) else None
-        merch_code = str(row['MERCHENDISE CATEGORY CODE']).strip() if not pd.isna(row['MERCHENDISE CATEGORY CODE']) else None
-        merch_desc = str(row['MERCHENDISE CATEGORY DESCRIPTION']).strip() if not pd.isna(row['MERCHENDISE CATEGORY DESCRIPTION']) else None
-        fabric_sheet = str(row['FABRIC_SHEET']).strip()
+    ]).dropna(subset=['MAJOR CATEGORY'])
+    
+    for row in strip_strings(cat_df).itertuples(index=False, name=None):
+        subdiv_code, original_code, full_form, merch_code, merch_desc, fabric_sheet = row
+        subdiv_code = intern_code(subdiv_code)
+        original_code = intern_code(original_code)
+        fabric_sheet = intern_code(fabric_sheet)
         
         # Handle duplicate codes by appending fabric sheet
         code = original_code
         if code in seen_codes:
-            code = f"{original_code}_{fabric_sheet}"
+            code = intern_code(f"{original_code}_{fabric_sheet}")
         seen_codes.add(code)
         
         major_categories.append({
@@ -232,78 +453,88 @@ def parse_excel(file_path: str) -> Dict:
     attributes = []
     processed_attrs = set()
     
-    # Get all attribute columns
-    all_cols = [col for col in combined_df.columns if col not in HIERARCHY_COLS and not str(col).startswith('Unnamed')]
-    
-    # Filter to actual attribute columns (not "FULL NAME" columns)
-    attr_cols = [col for col in all_cols if 'FULL NAME' not in col]
+    # Get actual attribute columns (not hierarchy or "FULL NAME" columns)
+    col_names = all_columns.astype(str)
+    is_full_name = col_names.str.contains('FULL NAME', regex=False)
+    is_attr = ~all_columns.isin(HIERARCHY_SET) & ~col_names.str.startswith('Unnamed') & ~is_full_name
+    attr_cols = all_columns[is_attr].tolist()
+    full_name_set = set(all_columns[is_full_name])
     
     print(f"   Processing {len(attr_cols)} attribute columns...", file=sys.stderr)
     
+    col_to_key = normalize_keys(all_columns)
+    
+    # Map each attribute column to its FULL NAME column (or None) once
+    full_name_cols = {}
     for col in attr_cols:
-        key = normalize_key(col)
+        full_name_col = col + ' FULL NAME'
+        full_name_cols[col] = full_name_col if full_name_col in full_name_set else None
+    
+    # Keep the first column for each key
+    attr_pairs = []
+    for col in attr_cols:
+        key = col_to_key[col]
         if not key or key in processed_attrs:
             continue
-        
-        # Get full name column if exists
-        full_name_col = col + ' FULL NAME'
-        has_full_names = full_name_col in combined_df.columns
-        
-        # Get unique values
-        unique_values = combined_df[col].dropna().unique()
-        
-        # Build value mapping (deduplicate by short_form)
-        allowed_values = []
-        seen_values = set()
-        
-        if has_full_names:
-            value_df = combined_df[[col, full_name_col]].drop_duplicates().dropna()
-            for _, row in value_df.iterrows():
-                short = str(row[col]).strip()
-                full = str(row[full_name_col]).strip()
-                
-                if short in seen_values:
-                    continue
-                seen_values.add(short)
-                
-                allowed_values.append({
-                    'short_form': short,
-                    'full_form': full,
-                    'aliases': generate_aliases(short, full)
-                })
+        processed_attrs.add(key)
+        attr_pairs.append((col, key, full_name_cols[col]))
+    
+    # Column sets per sheet, built once rather than per attribute
+    sheet_columns = [(df, set(df.columns)) for df in all_data]
+    
+    # Stack every attribute's (short, full) pairs into one tall frame so
+    # stripping and deduplication (by short_form) happen in a single pass
+    value_slices = []
+    for col, key, full_name_col in attr_pairs:
+        # Concatenate this attribute's per-sheet columns first so their dtypes
+        # unify (e.g. int + float -> float) exactly as a wide concat would
+        cols = [col, full_name_col] if full_name_col else [col]
+        values = pd.concat(
+            [df[[c for c in cols if c in columns]] for df, columns in sheet_columns],
+            ignore_index=True
+        )
+        if full_name_col:
+            pairs = values[cols].dropna()
+            pairs.columns = ['short', 'full']
         else:
             # No full names, use values as both short and full
-            for val in unique_values:
-                val_str = str(val).strip()
-                
-                if val_str in seen_values:
-                    continue
-                seen_values.add(val_str)
-                
-                allowed_values.append({
-                    'short_form': val_str,
-                    'full_form': val_str,
-                    'aliases': generate_aliases(val_str, val_str)
-                })
+            # (deduplicated up front so the stacked frame stays small)
+            unique_values = pd.Series(pd.unique(values[col].to_numpy())).dropna()
+            pairs = pd.DataFrame({'short': unique_values, 'full': unique_values})
+        value_slices.append(pairs.assign(attr=key))
+    
+    values_by_attr = {}
+    if value_slices:
+        tall = pd.concat(value_slices, ignore_index=True)
+        tall[['short', 'full']] = strip_strings(tall[['short', 'full']])
+        tall = tall.drop_duplicates(subset=['attr', 'short'])
+        for key, group in tall.groupby('attr', sort=False):
+            values_by_attr[key] = group[['short', 'full']].itertuples(index=False, name=None)
+    
+    classifications = classify_keys([key for _, key, _ in attr_pairs])
+    
+    for col, key, full_name_col in attr_pairs:
+        # Build value mapping (full_form only when it differs from short_form)
+        allowed_values = []
+        for short, full in values_by_attr.get(key, ()):
+            value = {'short_form': short}
+            if full != short:
+                value['full_form'] = full
+            value['aliases'] = list(generate_aliases(short, full))
+            allowed_values.append(value)
         
         # Determine attribute properties
-        category = categorize_attribute(key)
-        ai_extractable = is_ai_extractable(key)
-        visible = is_visible(key)
-        priority = get_priority(key)
+        category, ai_extractable, visible, priority = classifications[key]
         
         attributes.append({
             'key': key,
             'label': col,
-            'full_form': col,
             'category': category,
             'ai_extractable': ai_extractable,
             'visible_from_distance': visible,
             'extraction_priority': priority,
             'allowed_values': allowed_values
         })
-        
-        processed_attrs.add(key)
     
     print(f"   Extracted {len(attributes)} unique attributes", file=sys.stderr)
     
@@ -311,22 +542,22 @@ def parse_excel(file_path: str) -> Dict:
     print("\n🔗 Building Category-Attribute Mappings...", file=sys.stderr)
     category_mappings = []
     
-    for cat_code in combined_df['MAJOR CATEGORY'].unique():
-        if pd.isna(cat_code):
-            continue
-        
-        cat_df = combined_df[combined_df['MAJOR CATEGORY'] == cat_code]
-        
-        for col in attr_cols:
-            # Check if this attribute has any non-null values for this category
-            has_values = cat_df[col].notna().any()
-            if has_values:
-                attr_key = normalize_key(col)
-                if attr_key:
-                    category_mappings.append({
-                        'major_category': str(cat_code).strip(),
-                        'attribute': attr_key
-                    })
+    # Grouped pass per sheet: does each attribute have any non-null value per category?
+    counts = [
+        df.reindex(columns=['MAJOR CATEGORY'] + attr_cols).groupby('MAJOR CATEGORY', sort=False, observed=True).count()
+        for df in all_data
+    ]
+    has_values = pd.concat(counts).groupby(level=0, sort=False).sum().gt(0)
+    
+    for cat_code, row in has_values.iterrows():
+        cat_code = intern_code(str(cat_code).strip())
+        for col, has_value in row.items():
+            attr_key = col_to_key[col]
+            if has_value and attr_key:
+                category_mappings.append({
+                    'major_category': cat_code,
+                    'attribute': attr_key
+                })
     
     print(f"   Created {len(category_mappings)} mappings", file=sys.stderr)
     
@@ -352,10 +583,10 @@ if __name__ == '__main__':
     try:
         # Parse Excel file
         file_path = 'D:/ai-extracto/ai-vlm-integration/ATTRIBUTE MASTER.xlsx'
-        data = parse_excel(file_path)
+        data = parse_excel_cached(file_path)
         
         # Output as JSON to stdout
-        print(json.dumps(data, indent=2))
+        write_json(data)
         
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
@@ -30,14 +30,14 @@ interface ParsedData {
   attributes: Array<{
     key: string;
     label: string;
-    full_form: string;
+    full_form?: string; // omitted by the parser; same as label
     category: string;
     ai_extractable: boolean;
     visible_from_distance: boolean;
     extraction_priority: number;
     allowed_values: Array<{
       short_form: string;
-      full_form: string;
+      full_form?: string; // omitted when same as short_form
       aliases: string[];
     }>;
   }>;
@@ -191,7 +191,7 @@ async function main() {
       return {
         key: attr.key,
         label: attr.label,
-        fullForm: attr.full_form,
+        fullForm: attr.full_form ?? attr.label,
         type: attrType,
         category: attr.category,
         aiExtractable: attr.ai_extractable,
@@ -223,7 +223,7 @@ async function main() {
         allAllowedValues.push({
           attributeId: attrId,
           shortForm: val.short_form,
-          fullForm: val.full_form,
+          fullForm: val.full_form ?? val.short_form,
           aliases: val.aliases,
           displayOrder: idx + 1,
         });